@@ -5,22 +5,26 @@ Real-Time Transcription Backend
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import Response
 import asyncio
-import json
-import base64
+import hashlib
+import math
+import orjson
+import binascii
 import numpy as np
 import io
 import wave
-import threading
 import queue
-from collections import deque
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 import time
-import whisper
 import torch
 import torchaudio
-from pydub import AudioSegment
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+import av
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from typing import Dict, List
 import logging
@@ -29,63 +33,274 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Import settings
+from .settings import (
+    MONGO_URI, DB_NAME, WHISPER_MODEL_SIZE, SAMPLE_RATE,
+    CHUNK_DURATION, CHUNK_SIZE, MAX_AUDIO_BUFFER_SIZE,
+    MIN_CHUNKS_FOR_TRANSCRIPTION, ALLOWED_ORIGINS,
+    ALLOW_CREDENTIALS, SUPPORTED_LANGUAGES,
+    HOST, PORT, LOG_LEVEL
+)
+
 # Initialize FastAPI
 app = FastAPI(title="Real-Time Nigerian Language Transcription API")
 
 # Enable CORS for web frontend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,  
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Import settings
-from .settings import (
-    MONGO_URI, DB_NAME, WHISPER_MODEL_SIZE, SAMPLE_RATE, 
-    CHUNK_DURATION, CHUNK_SIZE, MAX_AUDIO_BUFFER_SIZE, 
-    MIN_CHUNKS_FOR_TRANSCRIPTION, ALLOWED_ORIGINS, 
-    ALLOW_CREDENTIALS, SUPPORTED_LANGUAGES
-)
-
-# MongoDB connection
-client = MongoClient(MONGO_URI)
+# MongoDB connections: the synchronous client serves the background flush
+# thread (w=0: fire-and-forget writes for telemetry-grade data), while
+# async request handlers use motor so Mongo I/O yields to the event loop
+client = MongoClient(MONGO_URI, w=0)
 db = client[DB_NAME]
+async_client = AsyncIOMotorClient(MONGO_URI)
+async_db = async_client[DB_NAME]
+
+# Indexes: history lookups hit (session_id, timestamp) instead of a
+# collection scan, and the TTL index evicts rows after 7 days
+try:
+    db.realtime_transcriptions.create_index([("session_id", 1), ("timestamp", 1)])
+    db.realtime_transcriptions.create_index("created_at", expireAfterSeconds=7 * 86400)
+except Exception as e:
+    logger.warning(f"Could not ensure MongoDB indexes: {e}")
 
-# Load Whisper model (you can switch to wav2vec or other models)
-logger.info("Loading Whisper model...")
-whisper_model = whisper.load_model(WHISPER_MODEL_SIZE)  # Change to "medium" or "large" for better accuracy
+# Transcription writes are queued here and flushed in bulk by a background
+# thread, so the inference path never waits on a Mongo round-trip
+_mongo_queue = queue.Queue()
+
+def _mongo_flush_worker():
+    """Drain queued transcription documents and insert them in batches"""
+    while True:
+        items = [_mongo_queue.get()]
+        deadline = time.time() + 0.5
+        while len(items) < 50:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(_mongo_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        try:
+            db.realtime_transcriptions.insert_many(items, ordered=False)
+        except Exception as e:
+            logger.error(f"Error flushing transcriptions to MongoDB: {e}")
+
+threading.Thread(target=_mongo_flush_worker, daemon=True, name="mongo-flush").start()
+
+# Load Whisper model via faster-whisper (CTranslate2 backend).
+# INT8 quantization gives ~4x the throughput of the eager FP16/FP32 model,
+# and the batched pipeline keeps the GPU busy under concurrent sessions.
+logger.info("Loading Whisper model (faster-whisper)...")
+if torch.cuda.is_available():
+    _whisper_backend = WhisperModel(WHISPER_MODEL_SIZE, device="cuda", compute_type="int8_float16")
+else:
+    _whisper_backend = WhisperModel(WHISPER_MODEL_SIZE, device="cpu", compute_type="int8")
+whisper_model = BatchedInferencePipeline(_whisper_backend)
 logger.info("Whisper model loaded successfully")
 
+# Warm up with one dummy forward so the first real chunk doesn't pay the
+# kernel-autotune / memory-pool allocation cliff
+logger.info("Warming up Whisper model...")
+# vad_filter must be off here: with it on, Silero sees no speech in the
+# zeros, the pipeline gets no clips, and no forward pass ever runs
+_warmup_segments, _ = whisper_model.transcribe(
+    np.zeros(SAMPLE_RATE, dtype=np.float32), language="en", beam_size=1,
+    vad_filter=False
+)
+for _segment in _warmup_segments:
+    pass
+logger.info("Whisper model warm-up complete")
+
+# Cheap speech gate: for conversational audio most windows are silence, and
+# skipping them saves the full encoder/decoder pass and the empty DB write
+logger.info("Loading Silero VAD model...")
+vad_model, _vad_utils = torch.hub.load("snakers4/silero-vad", "silero_vad")
+VAD_SPEECH_THRESHOLD = 0.3
+_VAD_FRAME = 512  # current Silero builds only score 512-sample frames at 16 kHz
+
+def _has_speech(audio_data: np.ndarray) -> bool:
+    """Return True if the window likely contains speech.
+
+    The window is scored frame by frame (Silero v5 rejects anything other
+    than 512-sample inputs at 16 kHz) with an early exit on the first frame
+    above the threshold. Runs on the inference executor, not the event loop.
+    """
+    try:
+        vad_model.reset_states()
+        tensor = torch.from_numpy(audio_data)
+        for start in range(0, len(tensor) - _VAD_FRAME + 1, _VAD_FRAME):
+            frame = tensor[start:start + _VAD_FRAME]
+            if vad_model(frame, SAMPLE_RATE).item() >= VAD_SPEECH_THRESHOLD:
+                return True
+        return False
+    except Exception as e:
+        # Fail open: better to transcribe silence than to drop speech
+        logger.error(f"VAD error: {e}")
+        return True
+
 # Audio processing configuration
 # SAMPLE_RATE, CHUNK_DURATION, and CHUNK_SIZE are now imported from settings
 
+# Single dedicated thread for all model inference: avoids per-chunk thread
+# creation cost and keeps CTranslate2 on one stable CUDA context/stream
+GPU_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-gpu")
+
+async def _send_json(websocket: WebSocket, payload: dict):
+    """Serialize with orjson instead of stdlib json; the frame stays text
+    so existing clients keep parsing event.data directly"""
+    await websocket.send_text(orjson.dumps(payload).decode())
+
+class TranscriptionBatcher:
+    """Coalesces transcription requests from all sessions into batched GPU jobs.
+
+    Queued requests are drained together and run as a single job on the
+    inference thread, so N concurrent sessions share one GPU dispatch
+    instead of spawning N competing threads.
+
+    max_wait_ms stays 0 until the backend exposes a true batched call:
+    CTranslate2 doesn't take stacked mel features here, so the per-item
+    loop in _transcribe_batch gains nothing from waiting for company.
+    """
+    def __init__(self, max_batch_size=8, max_wait_ms=0):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task = None
+
+    def start(self):
+        """Start the background batching worker (call from the event loop)."""
+        if self._worker_task is None:
+            self._worker_task = asyncio.create_task(self._worker())
+
+    async def submit(self, audio_data: np.ndarray, language: str):
+        """Queue audio for transcription and wait for its (text, confidence) result."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((audio_data, language, future))
+        return await future
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Block for the first request, then drain whatever else arrives
+            # within the batching window
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await loop.run_in_executor(GPU_EXECUTOR, self._transcribe_batch, batch)
+                for (_, _, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _transcribe_batch(self, batch):
+        """Run a drained batch as one GPU job on the inference thread."""
+        results = []
+        for audio_data, language, _ in batch:
+            segments, _info = whisper_model.transcribe(
+                audio_data,
+                language=None if language == "auto" else language,
+                beam_size=1,
+                vad_filter=False
+            )
+
+            texts = []
+            confidence_sum = 0.0
+            segment_count = 0
+            for segment in segments:
+                texts.append(segment.text)
+                confidence_sum += math.exp(segment.avg_logprob)
+                segment_count += 1
+
+            transcription = "".join(texts).strip()
+            avg_confidence = confidence_sum / segment_count if segment_count else 0.5
+            results.append((transcription, avg_confidence))
+        return results
+
+# Single batcher shared by every WebSocket session
+global_batcher = TranscriptionBatcher()
+
+@app.on_event("startup")
+async def start_batcher():
+    global_batcher.start()
+
 class AudioBuffer:
-    """Manages audio chunks for real-time processing"""
+    """Manages audio chunks for real-time processing.
+
+    Samples live in a preallocated float32 ring buffer, so steady-state
+    operation allocates nothing per chunk beyond the one window copy handed
+    to the inference thread.
+
+    Producer and consumer both run on the event-loop thread, so no lock is
+    needed — but reads must copy, because the returned window is read on
+    the inference thread while the event loop keeps writing into the ring.
+    """
     def __init__(self, max_size=MAX_AUDIO_BUFFER_SIZE):
-        self.buffer = deque(maxlen=max_size)
-        self.lock = threading.Lock()
-    
+        self.capacity = max_size * CHUNK_SIZE
+        self.ring = np.zeros(self.capacity, dtype=np.float32)
+        self.write_pos = 0       # next write offset into the ring
+        self.total_written = 0   # total samples written so far
+        self.chunks_added = 0
+
     def add_chunk(self, audio_data):
-        with self.lock:
-            self.buffer.append(audio_data)
-    
+        n = len(audio_data)
+        if n >= self.capacity:
+            # Oversized chunk: keep only the newest samples
+            self.ring[:] = audio_data[-self.capacity:]
+            self.write_pos = 0
+        else:
+            end = self.write_pos + n
+            if end <= self.capacity:
+                self.ring[self.write_pos:end] = audio_data
+            else:
+                first = self.capacity - self.write_pos
+                self.ring[self.write_pos:] = audio_data[:first]
+                self.ring[:end - self.capacity] = audio_data[first:]
+            self.write_pos = end % self.capacity
+        self.total_written += n
+        self.chunks_added += 1
+
     def get_audio_for_transcription(self):
-        with self.lock:
-            if len(self.buffer) >= MIN_CHUNKS_FOR_TRANSCRIPTION:  
-                # Combine last few chunks for context
-                combined = np.concatenate(list(self.buffer)[-3:])
-                return combined
+        if self.chunks_added < MIN_CHUNKS_FOR_TRANSCRIPTION:
             return None
 
+        # Last few chunks' worth of samples for context
+        window = min(self.total_written, CHUNK_SIZE * 3)
+        start = (self.write_pos - window) % self.capacity
+
+        if start + window <= self.capacity:
+            # Copy the window out: the view would be read on the inference
+            # thread while add_chunk keeps overwriting the ring behind it
+            return self.ring[start:start + window].copy()
+
+        # Window wraps the end of the ring: stitch the two runs
+        return np.concatenate((self.ring[start:], self.ring[:self.write_pos]))
+
 class TranscriptionSession:
     """Manages a single transcription session"""
     def __init__(self, websocket: WebSocket, language: str = "auto"):
         self.websocket = websocket
         self.language = language
         self.audio_buffer = AudioBuffer()
-        self.transcription_queue = queue.Queue()
         self.is_active = True
         self.session_id = str(int(time.time()))
         
@@ -102,84 +317,108 @@ class TranscriptionSession:
                 audio_for_transcription = self.audio_buffer.get_audio_for_transcription()
                 
                 if audio_for_transcription is not None:
-                    # Run transcription in background thread to avoid blocking
-                    threading.Thread(
-                        target=self._transcribe_audio_async,
-                        args=(audio_for_transcription,),
-                        daemon=True
-                    ).start()
-                    
+                    # Hand off to the shared batcher without blocking the
+                    # WebSocket receive loop
+                    asyncio.create_task(
+                        self._transcribe_and_send(audio_for_transcription)
+                    )
+
         except Exception as e:
             logger.error(f"Error processing audio chunk: {e}")
-            await self.websocket.send_text(json.dumps({
+            await _send_json(self.websocket, {
                 "type": "error",
                 "message": f"Audio processing error: {str(e)}"
-            }))
+            })
     
     def _bytes_to_audio_array(self, audio_data: bytes) -> np.ndarray:
-        """Convert audio bytes to numpy array"""
+        """Convert audio bytes to a mono 16kHz float32 numpy array"""
         try:
-            # Try to parse as WAV first
-            audio_io = io.BytesIO(audio_data)
-            
-            # Check if it's base64 encoded
-            if isinstance(audio_data, str):
-                audio_data = base64.b64decode(audio_data)
-                audio_io = io.BytesIO(audio_data)
-            
-            # Use pydub to handle various audio formats
-            audio_segment = AudioSegment.from_file(audio_io)
-            
+            # Fast path: 16-bit PCM WAV chunks decode with a single frombuffer
+            # instead of forking ffmpeg through pydub
+            if audio_data[:4] == b"RIFF" and audio_data[8:12] == b"WAVE":
+                with wave.open(io.BytesIO(audio_data)) as wav:
+                    if wav.getsampwidth() == 2 and wav.getcomptype() == "NONE":
+                        frames = wav.readframes(wav.getnframes())
+                        audio_array = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
+                        audio_array *= 1.0 / 32768.0  # Normalize to [-1, 1]
+
+                        if wav.getnchannels() > 1:
+                            audio_array = audio_array.reshape(-1, wav.getnchannels()).mean(axis=1)
+
+                        if wav.getframerate() != SAMPLE_RATE:
+                            audio_array = self._resample(audio_array, wav.getframerate())
+
+                        return audio_array
+
+            # Compressed formats (webm/opus etc.): torchaudio decodes in-process
+            waveform, rate = torchaudio.load(io.BytesIO(audio_data))
+
             # Convert to mono 16kHz
-            audio_segment = audio_segment.set_channels(1).set_frame_rate(SAMPLE_RATE)
-            
-            # Convert to numpy array
-            audio_array = np.array(audio_segment.get_array_of_samples(), dtype=np.float32)
-            audio_array = audio_array / 32768.0  # Normalize to [-1, 1]
-            
-            return audio_array
-            
+            if waveform.shape[0] > 1:
+                waveform = waveform.mean(dim=0, keepdim=True)
+            if rate != SAMPLE_RATE:
+                waveform = torchaudio.functional.resample(
+                    waveform, rate, SAMPLE_RATE, lowpass_filter_width=16
+                )
+
+            return waveform.squeeze(0).numpy()
+
         except Exception as e:
             logger.error(f"Error converting audio bytes: {e}")
             return None
+
+    def _resample(self, audio_array: np.ndarray, orig_rate: int) -> np.ndarray:
+        """Resample a float32 array to the target SAMPLE_RATE"""
+        waveform = torch.from_numpy(audio_array).unsqueeze(0)
+        waveform = torchaudio.functional.resample(
+            waveform, orig_rate, SAMPLE_RATE, lowpass_filter_width=16
+        )
+        return waveform.squeeze(0).numpy()
     
-    def _transcribe_audio_async(self, audio_data: np.ndarray):
-        """Transcribe audio in background thread"""
+    async def _transcribe_and_send(self, audio_data: np.ndarray):
+        """Transcribe audio through the shared batcher and deliver the result"""
         try:
-            # Use Whisper for transcription
-            result = whisper_model.transcribe(
-                audio_data,
-                language=None if self.language == "auto" else self.language,
-                fp16=torch.cuda.is_available()
+            # Skip silent windows before they cost a GPU pass; the VAD
+            # forward runs on the inference thread, off the event loop
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(GPU_EXECUTOR, _has_speech, audio_data):
+                return
+
+            # Zero-pad to the fixed 3-chunk window so every inference job
+            # sees the same input shape and cached kernels are reused
+            target_length = CHUNK_SIZE * 3
+            if len(audio_data) < target_length:
+                audio_data = np.pad(audio_data, (0, target_length - len(audio_data)))
+
+            transcription, avg_confidence = await global_batcher.submit(
+                audio_data, self.language
             )
-            
-            transcription = result["text"].strip()
-            confidence = result.get("segments", [{}])
-            avg_confidence = np.mean([seg.get("confidence", 0.5) for seg in confidence]) if confidence else 0.5
-            
+
             if transcription:  # Only send non-empty transcriptions
+                received_at = time.time()
+
                 # Send transcription via WebSocket
-                asyncio.create_task(self._send_transcription(transcription, avg_confidence))
-                
+                await self._send_transcription(transcription, avg_confidence, received_at)
+
                 # Store in MongoDB
-                self._store_transcription(transcription, avg_confidence)
-                
+                self._store_transcription(transcription, avg_confidence, received_at)
+
         except Exception as e:
             logger.error(f"Transcription error: {e}")
-            asyncio.create_task(self._send_error(f"Transcription error: {str(e)}"))
+            await self._send_error(f"Transcription error: {str(e)}")
     
-    async def _send_transcription(self, text: str, confidence: float):
+    async def _send_transcription(self, text: str, confidence: float, timestamp: float):
         """Send transcription result to client"""
         try:
             message = {
                 "type": "transcription",
                 "text": text,
                 "confidence": confidence,
-                "timestamp": time.time(),
+                "timestamp": timestamp,
                 "language": self.language,
                 "session_id": self.session_id
             }
-            await self.websocket.send_text(json.dumps(message))
+            await _send_json(self.websocket, message)
         except Exception as e:
             logger.error(f"Error sending transcription: {e}")
     
@@ -191,23 +430,21 @@ class TranscriptionSession:
                 "message": error_message,
                 "timestamp": time.time()
             }
-            await self.websocket.send_text(json.dumps(message))
+            await _send_json(self.websocket, message)
         except Exception as e:
             logger.error(f"Error sending error message: {e}")
     
-    def _store_transcription(self, text: str, confidence: float):
-        """Store transcription in MongoDB"""
-        try:
-            db.realtime_transcriptions.insert_one({
-                "session_id": self.session_id,
-                "text": text,
-                "confidence": confidence,
-                "language": self.language,
-                "timestamp": time.time(),
-                "created_at": time.time()
-            })
-        except Exception as e:
-            logger.error(f"Error storing transcription: {e}")
+    def _store_transcription(self, text: str, confidence: float, timestamp: float):
+        """Queue transcription for batched MongoDB insertion"""
+        _mongo_queue.put({
+            "session_id": self.session_id,
+            "text": text,
+            "confidence": confidence,
+            "language": self.language,
+            "timestamp": timestamp,
+            # Proper datetime so the TTL index can expire the row
+            "created_at": datetime.now(timezone.utc)
+        })
 
 # Store active WebSocket connections
 active_connections: Dict[str, TranscriptionSession] = {}
@@ -229,12 +466,12 @@ async def websocket_transcription(websocket: WebSocket):
     
     try:
         # Send connection confirmation
-        await websocket.send_text(json.dumps({
+        await _send_json(websocket, {
             "type": "connected",
             "session_id": session.session_id,
             "message": "Real-time transcription started",
-            "supported_languages": SUPPORTED_LANGUAGES  
-        }))
+            "supported_languages": SUPPORTED_LANGUAGES
+        })
         
         while True:
             # Wait for audio data
@@ -249,33 +486,34 @@ async def websocket_transcription(websocket: WebSocket):
                 elif "text" in data:
                     # JSON message (could be control commands)
                     try:
-                        message = json.loads(data["text"])
+                        message = orjson.loads(data["text"])
                         
                         if message.get("type") == "audio_chunk":
-                            # Base64 encoded audio
-                            audio_data = base64.b64decode(message["data"])
+                            # Base64 encoded audio (a2b_base64 skips the
+                            # validation wrapper around b64decode)
+                            audio_data = binascii.a2b_base64(message["data"])
                             await session.process_audio_chunk(audio_data)
                             
                         elif message.get("type") == "change_language":
                             # Change transcription language
                             session.language = message.get("language", "auto")
-                            await websocket.send_text(json.dumps({
+                            await _send_json(websocket, {
                                 "type": "language_changed",
                                 "language": session.language
-                            }))
+                            })
                             
                         elif message.get("type") == "ping":
                             # Heartbeat
-                            await websocket.send_text(json.dumps({
+                            await _send_json(websocket, {
                                 "type": "pong",
                                 "timestamp": time.time()
-                            }))
+                            })
                             
-                    except json.JSONDecodeError:
-                        await websocket.send_text(json.dumps({
+                    except orjson.JSONDecodeError:
+                        await _send_json(websocket, {
                             "type": "error",
                             "message": "Invalid JSON message"
-                        }))
+                        })
                         
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: {connection_id}")
@@ -287,31 +525,49 @@ async def websocket_transcription(websocket: WebSocket):
             del active_connections[connection_id]
         session.is_active = False
 
+def _transcribe_upload(audio_array: np.ndarray, language: str):
+    """Transcribe an uploaded file on the inference thread"""
+    segments, info = whisper_model.transcribe(
+        audio_array,
+        language=None if language == "auto" else language,
+        beam_size=1
+    )
+    transcription = "".join(segment.text for segment in segments).strip()
+    detected_language = info.language if info else "unknown"
+    return transcription, detected_language
+
 @app.post("/api/upload-transcribe")
 async def upload_and_transcribe(file: UploadFile = File(...), language: str = "auto"):
     """Upload audio file for batch transcription"""
     try:
         # Read audio file
         audio_data = await file.read()
+
+        # Decode + resample in-process with PyAV: no ffmpeg subprocess, no
+        # temp file, and "flt" frames arrive as float32 in [-1, 1] so there
+        # is no int16 round-trip or normalize pass
+        container = av.open(io.BytesIO(audio_data))
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        chunks = []
+        for frame in container.decode(audio=0):
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().ravel())
+        # Flush: libswresample buffers samples during rate conversion, so
+        # without this drain the tail of the file is dropped
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().ravel())
+        container.close()
+        audio_array = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
         
-        # Process with whisper
-        audio_io = io.BytesIO(audio_data)
-        audio_segment = AudioSegment.from_file(audio_io)
-        audio_segment = audio_segment.set_channels(1).set_frame_rate(SAMPLE_RATE)
-        audio_array = np.array(audio_segment.get_array_of_samples(), dtype=np.float32)
-        audio_array = audio_array / 32768.0
-        
-        # Transcribe
-        result = whisper_model.transcribe(
-            audio_array,
-            language=None if language == "auto" else language
+        # Transcribe on the shared inference thread so uploads don't block
+        # the event loop or fight realtime sessions for the GPU
+        loop = asyncio.get_running_loop()
+        transcription, detected_language = await loop.run_in_executor(
+            GPU_EXECUTOR, _transcribe_upload, audio_array, language
         )
         
-        transcription = result["text"]
-        detected_language = result.get("language", "unknown")
-        
         # Store in MongoDB
-        db.batch_transcriptions.insert_one({
+        await async_db.batch_transcriptions.insert_one({
             "filename": file.filename,
             "transcription": transcription,
             "language": detected_language,
@@ -335,11 +591,11 @@ async def upload_and_transcribe(file: UploadFile = File(...), language: str = "a
 async def get_transcription_history(session_id: str):
     """Get transcription history for a session"""
     try:
-        transcriptions = list(db.realtime_transcriptions.find(
+        transcriptions = await async_db.realtime_transcriptions.find(
             {"session_id": session_id},
             {"_id": 0}
-        ).sort("timestamp", 1))
-        
+        ).sort("timestamp", 1).to_list(1000)
+
         return {"transcriptions": transcriptions}
     except Exception as e:
         return {"error": str(e)}, 500
@@ -354,10 +610,9 @@ async def health_check():
         "timestamp": time.time()
     }
 
-@app.get("/")
-async def get_demo_page():
-    """Serve a simple demo page for testing"""
-    
+def _build_demo_page() -> str:
+    """Build the demo page HTML (runs once at import time)"""
+
     # Generate language options dynamically from settings
     language_options = ""
     for lang in SUPPORTED_LANGUAGES:
@@ -485,8 +740,29 @@ async def get_demo_page():
     </body>
     </html>
     """
-    return HTMLResponse(content=html_content)
+    return html_content
+
+# Prebuild the page: the content only depends on settings fixed at startup
+_DEMO_HTML_BYTES = _build_demo_page().encode()
+_DEMO_ETAG = f'"{hashlib.md5(_DEMO_HTML_BYTES).hexdigest()}"'
+
+@app.get("/")
+async def get_demo_page():
+    """Serve the prebuilt demo page"""
+    return Response(
+        content=_DEMO_HTML_BYTES,
+        media_type="text/html",
+        headers={"Cache-Control": "public, max-age=3600", "ETag": _DEMO_ETAG}
+    )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=HOST, port=PORT, log_level=LOG_LEVEL.lower())
\ No newline at end of file
+    uvicorn.run(
+        app,
+        host=HOST,
+        port=PORT,
+        log_level=LOG_LEVEL.lower(),
+        loop="uvloop",
+        http="httptools",
+        ws="websockets"
+    )
\ No newline at end of file
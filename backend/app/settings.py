@@ -5,54 +5,67 @@ This module loads configuration from environment variables and provides
 default values for the transcription backend application.
 """
 
+import json
 import os
+from dataclasses import dataclass, field
 from typing import List
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+def _json_env(name: str, default: str) -> List[str]:
+    """Parse a JSON list from an environment variable"""
+    return json.loads(os.getenv(name, default))
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings loaded from environment variables"""
-    
+    """Application settings loaded from environment variables.
+
+    Frozen with slots so every value is read once at import and attribute
+    access is a single C-level slot lookup.
+    """
+
     # Database Configuration
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     DB_NAME: str = os.getenv("DB_NAME", "transcription_db")
-    
+
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
-    
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+
     # Whisper Model Configuration
     WHISPER_MODEL_SIZE: str = os.getenv("WHISPER_MODEL_SIZE", "small")
     SAMPLE_RATE: int = int(os.getenv("SAMPLE_RATE", "16000"))
     CHUNK_DURATION: float = float(os.getenv("CHUNK_DURATION", "2.0"))
-    
+
     # Audio Processing
     MAX_AUDIO_BUFFER_SIZE: int = int(os.getenv("MAX_AUDIO_BUFFER_SIZE", "10"))
     MIN_CHUNKS_FOR_TRANSCRIPTION: int = int(os.getenv("MIN_CHUNKS_FOR_TRANSCRIPTION", "2"))
-    
-    # CORS Configuration
-    ALLOWED_ORIGINS: List[str] = eval(os.getenv("ALLOWED_ORIGINS", '["*"]'))
+
+    # CORS Configuration (JSON lists, parsed without eval)
+    ALLOWED_ORIGINS: List[str] = field(
+        default_factory=lambda: _json_env("ALLOWED_ORIGINS", '["*"]')
+    )
     ALLOW_CREDENTIALS: bool = os.getenv("ALLOW_CREDENTIALS", "true").lower() == "true"
-    
+
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    
+
     # Supported Languages
-    SUPPORTED_LANGUAGES: List[str] = eval(os.getenv("SUPPORTED_LANGUAGES", '["auto", "en", "yo", "ig", "ha"]'))
-    
-    # Computed values
-    @property
-    def CHUNK_SIZE(self) -> int:
-        """Calculate chunk size based on sample rate and duration"""
-        return int(self.SAMPLE_RATE * self.CHUNK_DURATION)
-    
-    @property
-    def DATABASE_URL(self) -> str:
-        """Get full database URL"""
-        return f"{self.MONGO_URI}{self.DB_NAME}"
+    SUPPORTED_LANGUAGES: List[str] = field(
+        default_factory=lambda: _json_env("SUPPORTED_LANGUAGES", '["auto", "en", "yo", "ig", "ha"]')
+    )
+
+    # Computed values (filled in once at construction)
+    CHUNK_SIZE: int = 0
+    DATABASE_URL: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "CHUNK_SIZE", int(self.SAMPLE_RATE * self.CHUNK_DURATION))
+        object.__setattr__(self, "DATABASE_URL", f"{self.MONGO_URI}{self.DB_NAME}")
 
 # Create global settings instance
 settings = Settings()
@@ -63,6 +76,7 @@ DB_NAME = settings.DB_NAME
 HOST = settings.HOST
 PORT = settings.PORT
 DEBUG = settings.DEBUG
+WORKERS = settings.WORKERS
 WHISPER_MODEL_SIZE = settings.WHISPER_MODEL_SIZE
 SAMPLE_RATE = settings.SAMPLE_RATE
 CHUNK_DURATION = settings.CHUNK_DURATION
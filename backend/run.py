@@ -4,14 +4,58 @@ Main entry point for the transcription backend server
 This script uses the centralized settings configuration to start the server.
 """
 
+import asyncio
+import os
+import subprocess
+import sys
+
 import uvicorn
-from app.settings import HOST, PORT, DEBUG, LOG_LEVEL
+import uvloop
+
+from app.settings import HOST, PORT, DEBUG, LOG_LEVEL, WORKERS
+
+# Install uvloop as the default policy so code that doesn't go through
+# uvicorn (scripts, test clients) gets the faster loop too
+asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+def launch_workers(num_workers: int):
+    """Spawn one uvicorn process per worker, each pinned to its own GPU.
+
+    Worker N listens on PORT+N with CUDA_VISIBLE_DEVICES=N, so each process
+    loads its own model on a dedicated GPU. Put a sticky (ip_hash) reverse
+    proxy in front so a WebSocket session stays on one worker.
+    """
+    processes = []
+    for rank in range(num_workers):
+        env = os.environ.copy()
+        env["CUDA_VISIBLE_DEVICES"] = str(rank)
+        command = [
+            sys.executable, "-m", "uvicorn",
+            "app.realtime_transcription:app",
+            "--host", HOST,
+            "--port", str(PORT + rank),
+            "--log-level", LOG_LEVEL.lower(),
+            "--loop", "uvloop",
+            "--http", "httptools",
+            "--ws", "websockets"
+        ]
+        print(f"Starting worker {rank} on port {PORT + rank} (GPU {rank})")
+        processes.append(subprocess.Popen(command, env=env))
+
+    for process in processes:
+        process.wait()
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.realtime_transcription:app",
-        host=HOST,
-        port=PORT,
-        reload=DEBUG,
-        log_level=LOG_LEVEL.lower()
-    )
+    if WORKERS > 1:
+        launch_workers(WORKERS)
+    else:
+        uvicorn.run(
+            "app.realtime_transcription:app",
+            host=HOST,
+            port=PORT,
+            reload=DEBUG,
+            log_level=LOG_LEVEL.lower(),
+            loop="uvloop",
+            http="httptools",
+            ws="websockets"
+        )
@@ -1,10 +1,14 @@
 import os
 import sys
-import shutil
-import json
-from pydub import AudioSegment
+import time
+import orjson
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pymongo import MongoClient
-from datetime import datetime
+from pymongo.write_concern import WriteConcern
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
 # Ensure Python recognizes this directory as a package
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
@@ -12,6 +16,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".
 # Import DataCrawler
 from data.raw.data_crawler import DataCrawler
 
+# Queue-backed logging: the hot loops only enqueue a record; the listener
+# thread does the actual stdout write, so per-file logging never blocks on
+# a flush
+log = logging.getLogger(__name__)
+if not logging.getLogger().handlers:
+    _log_queue = SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format="%(message)s",
+                        handlers=[QueueHandler(_log_queue)])
+    QueueListener(_log_queue, logging.StreamHandler()).start()
+
 # MongoDB Setup
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "transcription_db"
@@ -40,162 +54,351 @@ os.makedirs(PROCESSED_HTM_DIR, exist_ok=True)
 os.makedirs(CONVERTED_AUDIO_DIR, exist_ok=True)
 
 
+def _convert_one(job):
+    """Convert one audio file to 16kHz mono WAV (runs in a worker process).
+
+    Top-level so it pickles cleanly; returns the log document instead of
+    writing to MongoDB so the parent can bulk-insert after the pool drains.
+    """
+    input_path, output_path = job
+    # One ffmpeg spawn that streams decode -> resample -> encode in C; pydub
+    # materialized the decoded PCM in Python and invoked ffmpeg twice.
+    # -threads 1 because the pool already fills every core.
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+        "-i", input_path,
+        "-ac", "1", "-ar", "16000", "-threads", "1",
+        "-f", "wav", output_path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"ffmpeg exited with {result.returncode}")
+        return {
+            "action": "convert_audio",
+            "status": "success",
+            "details": {"original": input_path, "converted": output_path},
+            "timestamp": time.time_ns()
+        }
+    except Exception as e:
+        return {
+            "action": "convert_audio",
+            "status": "failed",
+            "details": {"original": input_path, "error": str(e)},
+            "timestamp": time.time_ns()
+        }
+
+
+def _sendfile_move(src, dst):
+    """Move src to dst across filesystems with a kernel-space copy.
+
+    os.sendfile shuttles the bytes directly between the two descriptors,
+    so nothing is read into a Python buffer on the way through.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        while remaining > 0:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, remaining)
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+    os.unlink(src)
+
+
+def _validate_json(job):
+    """Parse one JSON file for validity (runs in a worker thread)."""
+    input_path, output_path = job
+    try:
+        with open(input_path, "rb") as f:
+            orjson.loads(f.read())
+        return input_path, output_path, True, None
+    except orjson.JSONDecodeError as e:
+        return input_path, output_path, False, str(e)
+
+
 class DataPreprocessor:
+    _LOG_FLUSH = 500  # buffered log entries per bulk write
+
     def __init__(self):
         self.client = MongoClient(MONGO_URI)
         self.db = self.client[DB_NAME]
         self.log_collection = self.db.process_logs  # Store only process metadata
+        self._log_buffer = []
+        self._converted_cache = None  # lazily loaded snapshot of done paths
+        self._known_dirs = set()  # dirs already created this run
+
+        # Keep dedup lookups on process_logs indexed
+        self.log_collection.create_index([("action", 1), ("details.converted", 1)])
 
     def log_process(self, action, status, details):
-        """Log metadata of the process in MongoDB."""
-        self.log_collection.insert_one({
+        """Buffer process metadata and flush to MongoDB in bulk."""
+        self._log_buffer.append({
             "action": action,
             "status": status,
             "details": details,
-            "timestamp": datetime.utcnow()
+            "timestamp": time.time_ns()
         })
+        if len(self._log_buffer) >= self._LOG_FLUSH:
+            self._flush_logs()
+
+    def _flush_logs(self):
+        """Write buffered log documents with a single unacknowledged bulk insert."""
+        if not self._log_buffer:
+            return
+        self.log_collection.with_options(
+            write_concern=WriteConcern(w=0)
+        ).insert_many(self._log_buffer, ordered=False)
+        self._log_buffer = []
 
     def ensure_directory_exists(self, file_path):
-        """Ensure that the output directory exists before writing the file."""
+        """Ensure that the output directory exists before writing the file.
+
+        A set of already-created directories turns the per-file stat into a
+        hash lookup; files cluster into few directories, so the syscall count
+        drops from one per file to one per unique directory.
+        """
         directory = os.path.dirname(file_path)
-        if not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-            print(f"Created directory: {directory}")
+        if directory in self._known_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._known_dirs.add(directory)
+
+    def iter_dirs(self, root_dir):
+        """Yield every subdirectory under root_dir via scandir.
+
+        DirEntry carries cached stat info, so this issues roughly half the
+        syscalls of an os.walk over the same tree.
+        """
+        stack = [root_dir]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            yield entry.path
+                            stack.append(entry.path)
+            except FileNotFoundError:
+                continue
+
+    def scan_raw(self):
+        """Walk RAW_AUDIO_DIR once and index everything the pipeline needs.
+
+        Returns a dict with the subdirectories to mirror, the audio files
+        under the KJV mp3bible tree, and the set of non-empty directories,
+        so the pipeline steps share one pass instead of re-walking the
+        tree apiece.
+        """
+        mp3bible_root = os.path.join(RAW_AUDIO_DIR, "english", "kjv", "mp3bible")
+        index = {
+            "dirs": [],
+            "audio_files": [],
+            "non_empty_dirs": set(),
+        }
 
-    def ensure_audio_folder_structure(self):
+        stack = [RAW_AUDIO_DIR]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        index["non_empty_dirs"].add(current)
+                        if entry.is_dir(follow_symlinks=False):
+                            index["dirs"].append(entry.path)
+                            stack.append(entry.path)
+                        elif entry.path.startswith(mp3bible_root) and entry.name.endswith((".mp3", ".wav")):
+                            index["audio_files"].append(entry.path)
+            except FileNotFoundError:
+                continue
+
+        return index
+
+    def ensure_audio_folder_structure(self, raw_index):
         """Ensure all folders in /raw/extracted_audio/ exist in /processed/audio/converted_audio/."""
-        for root, dirs, _ in os.walk(RAW_AUDIO_DIR):
-            for dir_name in dirs:
-                raw_subdir = os.path.join(root, dir_name)
-                relative_path = os.path.relpath(raw_subdir, RAW_AUDIO_DIR)
-                processed_subdir = os.path.join(CONVERTED_AUDIO_DIR, relative_path)
+        # Snapshot the destination tree once so mirroring skips the mkdir
+        # syscall for every directory that already exists
+        existing = set(self.iter_dirs(CONVERTED_AUDIO_DIR))
+        existing.add(CONVERTED_AUDIO_DIR)
+
+        created = 0
+        for raw_subdir in raw_index["dirs"]:
+            relative_path = os.path.relpath(raw_subdir, RAW_AUDIO_DIR)
+            processed_subdir = os.path.join(CONVERTED_AUDIO_DIR, relative_path)
 
+            if processed_subdir not in existing:
                 os.makedirs(processed_subdir, exist_ok=True)
-                print(f"Ensured folder exists: {processed_subdir}")
+                existing.add(processed_subdir)
+                created += 1
 
-    def run_crawler_if_needed(self):
-        """Runs DataCrawler only if raw data is missing for ANY language."""
-        required_dirs = {
-            "english_json": os.path.join(RAW_TEXT_DIR, "english", "kjv", "mp3bible", "json"),
+        print(f"Ensured audio folder structure ({created} new directories).")
+
+    def run_crawler_if_needed(self, raw_index):
+        """Runs DataCrawler only if raw data is missing for ANY language.
+
+        Returns True if the crawler ran (so callers can rescan the raw tree).
+        """
+        # The text dir lives outside RAW_AUDIO_DIR, so it gets its own check;
+        # the audio roots come from the shared scan
+        required_audio_dirs = {
             "hausa_audio": os.path.join(RAW_AUDIO_DIR, "hausa"),
             "igbo_audio": os.path.join(RAW_AUDIO_DIR, "igbo"),
             "yoruba_audio": os.path.join(RAW_AUDIO_DIR, "yoruba", "naijasermons"),
         }
 
-        missing_data = [lang for lang, path in required_dirs.items() if not os.path.exists(path) or not os.listdir(path)]
+        missing_data = [
+            lang for lang, path in required_audio_dirs.items()
+            if path not in raw_index["non_empty_dirs"]
+        ]
+
+        english_json_dir = os.path.join(RAW_TEXT_DIR, "english", "kjv", "mp3bible", "json")
+        if not os.path.exists(english_json_dir) or not os.listdir(english_json_dir):
+            missing_data.insert(0, "english_json")
 
         if not missing_data:
             print("All raw data found. Skipping DataCrawler.")
-        else:
-            print(f"Missing raw data for: {', '.join(missing_data)}. Running DataCrawler...")
-            crawler = DataCrawler()
-            crawler.run_all_crawlers()
-            self.log_process("run_crawler", "completed", {"missing_data": missing_data})
-
-    def convert_audio(self, input_path, output_path):
-        """Convert audio to 16kHz mono WAV and save to output directory."""
-        try:
-            # Skip conversion if the file already exists in MongoDB or filesystem
+            return False
+
+        print(f"Missing raw data for: {', '.join(missing_data)}. Running DataCrawler...")
+        crawler = DataCrawler()
+        crawler.run_all_crawlers()
+        self.log_process("run_crawler", "completed", {"missing_data": missing_data})
+        return True
+
+    def _already_converted(self, output_path):
+        """O(1) membership test against a lazily loaded snapshot of process_logs.
+
+        The snapshot is one distinct() query, loaded on first use and kept
+        until process_audio_files invalidates it, so repeated job collection
+        within a run never re-queries MongoDB.
+        """
+        if self._converted_cache is None:
+            self._converted_cache = frozenset(self.log_collection.distinct(
+                "details.converted",
+                {"action": "convert_audio", "status": "success"}
+            ))
+        return output_path in self._converted_cache
+
+    def collect_audio_jobs(self, raw_index):
+        """Gather (input_path, output_path) pairs that still need conversion."""
+        # Only KJV MP3 Bible files are converted; the shared scan already
+        # restricted audio_files to that subtree
+        audio_source_dir = os.path.join(RAW_AUDIO_DIR, "english", "kjv", "mp3bible")
+
+        jobs = []
+        for input_path in raw_index["audio_files"]:
+            # Maintain correct relative path from `mp3bible/`
+            relative_path = os.path.relpath(input_path, audio_source_dir)
+            output_path = os.path.join(CONVERTED_AUDIO_DIR, "english", "kjv", "mp3bible", relative_path).replace(".mp3", ".wav")
+
+            # Skip-checks happen here in the parent so no-op jobs
+            # never reach the worker pool
             if os.path.exists(output_path):
-                print(f"Skipping conversion (file already exists): {output_path}")
-                return
+                log.info("Skipping conversion (file already exists): %s", output_path)
+                continue
 
-            # Check MongoDB logs to see if file was already converted
-            if self.db.process_logs.find_one({"action": "convert_audio", "converted": output_path}):
-                print(f"Skipping conversion (file already logged in MongoDB): {output_path}")
-                return
+            if self._already_converted(output_path):
+                log.info("Skipping conversion (file already logged in MongoDB): %s", output_path)
+                continue
 
             self.ensure_directory_exists(output_path)
-            audio = AudioSegment.from_file(input_path)
-            audio = audio.set_frame_rate(16000).set_channels(1)
-            audio.export(output_path, format="wav")
-            print(f"🎵 Converted: {output_path}")
-
-            # Log the successful conversion in MongoDB
-            self.log_process("convert_audio", "success", {
-                "original": input_path,
-                "converted": output_path
-            })
-
-        except Exception as e:
-            print(f"Error processing {input_path}: {e}")
-            self.log_process("convert_audio", "failed", {
-                "original": input_path,
-                "error": str(e)
-            })
-
-
-    def process_audio_files(self):
-        """Convert raw audio files to 16kHz WAV and save to the correct processed directory."""
+            jobs.append((input_path, output_path))
+
+        return jobs
+
+    def process_audio_files(self, raw_index):
+        """Convert raw audio files to 16kHz WAV in parallel across CPU cores."""
         print("Converting audio files...")
 
-        # Ensure we are processing only KJV MP3 Bible files
-        audio_source_dirs = [
-            os.path.join(RAW_AUDIO_DIR, "english", "kjv", "mp3bible"),  # Correct KJV directory
-        ]
+        jobs = self.collect_audio_jobs(raw_index)
+        if not jobs:
+            print("No audio files need conversion.")
+            return
 
-        for audio_source_dir in audio_source_dirs:
-            for root, _, files in os.walk(audio_source_dir):
-                for file in files:
-                    if file.endswith(".mp3") or file.endswith(".wav"):
-                        input_path = os.path.join(root, file)
+        # ffmpeg decode/encode is CPU-bound and embarrassingly parallel
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(_convert_one, jobs, chunksize=8))
 
-                        # Maintain correct relative path from `mp3bible/`
-                        relative_path = os.path.relpath(input_path, audio_source_dir)
-                        output_path = os.path.join(CONVERTED_AUDIO_DIR, "english", "kjv", "mp3bible", relative_path).replace(".mp3", ".wav")
+        # Log from the parent: forked workers inherit the QueueHandler but
+        # not the listener thread, so records emitted there go nowhere
+        for result in results:
+            if result["status"] == "success":
+                log.info("🎵 Converted: %s", result["details"]["converted"])
+            else:
+                log.info("Error processing %s: %s",
+                         result["details"]["original"], result["details"]["error"])
 
-                        # Ensure correct directory exists
-                        self.ensure_directory_exists(output_path)
+        # One bulk write for the whole batch instead of a round-trip per file
+        self.log_collection.insert_many(results)
 
-                        # Convert and save
-                        self.convert_audio(input_path, output_path)
+        # New conversions were just logged, so the snapshot is stale
+        self._converted_cache = None
 
 
     def process_json_files(self):
-        """Move JSON files to processed directory if they can be validated."""
+        """Validate JSON files in parallel, then move the valid ones."""
         print("Processing JSON files...")
 
         json_source_dirs = [
             os.path.join(RAW_TEXT_DIR, "english", "kjv", "mp3bible", "json"),
         ]
 
+        jobs = []
         for json_source_dir in json_source_dirs:
             for root, _, files in os.walk(json_source_dir):
                 for file in files:
                     if file.endswith(".json"):
                         input_path = os.path.join(root, file)
                         relative_path = os.path.relpath(input_path, json_source_dir)
-                        output_path = os.path.join(PROCESSED_JSON_DIR, relative_path)
-
-                        try:
-                            with open(input_path, "r", encoding="utf-8") as f:
-                                json.load(f)
-
-                            print(f"Valid JSON: {input_path}")
-                            self.ensure_directory_exists(output_path)
-                            shutil.move(input_path, output_path)
-                            print(f"Moved: {input_path} → {output_path}")
-
-                            # Log process
-                            self.log_process("process_json", "success", {
-                                "original": input_path,
-                                "processed": output_path
-                            })
-
-                        except json.JSONDecodeError as e:
-                            print(f"Invalid JSON: {input_path} - {e}")
-                            self.log_process("process_json", "failed", {
-                                "original": input_path,
-                                "error": str(e)
-                            })
+                        jobs.append((input_path, os.path.join(PROCESSED_JSON_DIR, relative_path)))
+
+        if not jobs:
+            print("No JSON files to process.")
+            return
+
+        # Read + parse in worker threads (the reads overlap disk latency and
+        # orjson releases the GIL during the byte scan); moves and logging
+        # happen back on the main thread
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            outcomes = list(executor.map(_validate_json, jobs))
+
+        for input_path, output_path, ok, error in outcomes:
+            if ok:
+                log.info("Valid JSON: %s", input_path)
+                self.ensure_directory_exists(output_path)
+                try:
+                    # Same-filesystem move: one rename syscall
+                    os.replace(input_path, output_path)
+                except OSError:
+                    # Cross-device fallback: copy + delete
+                    _sendfile_move(input_path, output_path)
+                log.info("Moved: %s → %s", input_path, output_path)
+
+                # Log process
+                self.log_process("process_json", "success", {
+                    "original": input_path,
+                    "processed": output_path
+                })
+            else:
+                log.info("Invalid JSON: %s - %s", input_path, error)
+                self.log_process("process_json", "failed", {
+                    "original": input_path,
+                    "error": error
+                })
 
     def run_pipeline(self):
         """Run full preprocessing pipeline."""
-        self.ensure_audio_folder_structure()
-        self.run_crawler_if_needed()
-        self.process_audio_files()
+        raw_index = self.scan_raw()
+        self.ensure_audio_folder_structure(raw_index)
+        if self.run_crawler_if_needed(raw_index):
+            # The crawler added files, so the index is stale
+            raw_index = self.scan_raw()
+            self.ensure_audio_folder_structure(raw_index)
+        self.process_audio_files(raw_index)
         self.process_json_files()
         self.log_process("run_pipeline", "completed", {"message": "Data processing pipeline finished"})
+        self._flush_logs()
         print("Data processing pipeline completed!")
 
 if __name__ == "__main__":
@@ -1,13 +1,35 @@
 import os
+import glob
 import json
-import whisper
+import logging
+import argparse
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+import orjson
 import torch
 import torchaudio
-import librosa
-import wave
+from concurrent.futures import ThreadPoolExecutor
+from torch.utils.data import Dataset, DataLoader
 from vosk import Model, KaldiRecognizer
+
+from vosk import BatchModel, BatchRecognizer, GpuInit
+from faster_whisper import WhisperModel, BatchedInferencePipeline
 from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
 
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Per-file progress only enqueues a record; the listener thread owns the
+# stdout writes, so a 10k-file batch never stalls on line-buffered flushes
+logger = logging.getLogger("asr")
+if not logging.getLogger().handlers:
+    _log_queue = SimpleQueue()
+    logging.basicConfig(level=logging.INFO, format="%(message)s",
+                        handlers=[QueueHandler(_log_queue)])
+    QueueListener(_log_queue, logging.StreamHandler()).start()
+
 # Define directories
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 AUDIO_DIR = os.path.join(BASE_DIR, "data", "processed", "audio", "converted_audio")
@@ -17,70 +39,317 @@ TRANSCRIPT_DIR = os.path.join(BASE_DIR, "data", "processed", "text", "transcript
 os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
 
 # Load models
-print("🔹 Loading models...")
-whisper_model = whisper.load_model("small")
+logger.info("🔹 Loading models...")
+# CTranslate2 backend with INT8 weights: fused kernels and half the memory
+# traffic of the FP32 PyTorch decoder, batched across files per call.
+# On GPU, CT2 keeps the mel features, KV cache and logits resident on the
+# device for the whole decode loop, so there are no hidden per-step PCIe
+# copies to eliminate with ONNX IO binding
+_CUDA = torch.cuda.is_available()
+# With two or more GPUs, Whisper decodes on cuda:0 while Wav2Vec2 runs on
+# cuda:1 — CUDA streams are per-device, so the backends overlap fully
+_W2V_DEVICE = "cuda:1" if torch.cuda.device_count() > 1 else "cuda"
+# Pin the converted CT2 weights to a project-local cache so repeat runs
+# memory-map the ready graph instead of re-downloading/convert-checking
+WHISPER_CACHE_DIR = os.path.join(BASE_DIR, "data", "raw", "models", "whisper-ct2")
+# CT2's int8 kernels hit the same AVX2/VNNI dot products as ggml Q8; the
+# compute type stays overridable for hosts that prefer e.g. full int8
+_WHISPER_COMPUTE = os.getenv(
+    "WHISPER_COMPUTE_TYPE", "int8_float16" if _CUDA else "int8"
+)
+whisper_model = WhisperModel(
+    "small",
+    device="cuda" if _CUDA else "cpu",
+    compute_type=_WHISPER_COMPUTE,
+    download_root=WHISPER_CACHE_DIR,
+)
+whisper_batched = BatchedInferencePipeline(model=whisper_model)
 wav2vec_processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-large-960h")
 wav2vec_model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-large-960h")
 
+WAV2VEC_ONNX_PATH = os.path.join(os.path.dirname(__file__), "wav2vec2.onnx")
+
+def _wav2vec_onnx_session(model):
+    """Export Wav2Vec2 once and open it in ONNX Runtime.
+
+    ORT fuses the GELU/LayerNorm/matmul chain, roughly halving CPU latency
+    against the eager forward. The export runs only on the first invocation;
+    later runs just open the existing graph.
+    """
+    if not os.path.exists(WAV2VEC_ONNX_PATH):
+        dummy_values = torch.zeros(1, 16000)
+        dummy_mask = torch.ones(1, 16000, dtype=torch.long)
+        torch.onnx.export(
+            model, (dummy_values, dummy_mask), WAV2VEC_ONNX_PATH,
+            input_names=["input_values", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_values": {0: "batch", 1: "time"},
+                "attention_mask": {0: "batch", 1: "time"},
+                "logits": {0: "batch", 1: "frames"},
+            },
+            opset_version=17,
+        )
+    providers = (
+        ["CUDAExecutionProvider", "CPUExecutionProvider"]
+        if _CUDA else ["CPUExecutionProvider"]
+    )
+    return onnxruntime.InferenceSession(WAV2VEC_ONNX_PATH, providers=providers)
+
+wav2vec_session = None
+if onnxruntime is not None and not _CUDA:
+    # ORT is a CPU-inference win only; on GPU hosts the common CPU-only
+    # wheel would silently demote the FP16 path to CPU execution
+    wav2vec_session = _wav2vec_onnx_session(wav2vec_model.eval())
+elif _CUDA:
+    # FP16 halves the bytes moved through the attention matmuls and
+    # torch.compile removes per-call Python dispatch overhead
+    wav2vec_model = wav2vec_model.to(_W2V_DEVICE).half().eval()
+    wav2vec_model = torch.compile(wav2vec_model, mode="reduce-overhead")
+else:
+    # CPU-only host: dynamic INT8 on the Linear layers (the FFN/attention
+    # projections carry most of the FLOPs) roughly doubles throughput and
+    # shrinks the resident weights by almost half
+    wav2vec_model = wav2vec_model.eval()
+    torch.backends.quantized.engine = "qnnpack"
+    wav2vec_model = torch.quantization.quantize_dynamic(
+        wav2vec_model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
 vosk_model_path = os.path.join(BASE_DIR, "data", "raw", "models", "vosk-model")
-vosk_model = Model(vosk_model_path)
+# The CPU wheel exports BatchModel but its constructor returns NULL inside
+# libvosk, so only a successful construction proves a GPU build
+try:
+    GpuInit()
+    # Batch decoding amortizes the beam search across concurrent streams
+    vosk_model = BatchModel(vosk_model_path)
+    _VOSK_BATCH = True
+except Exception:
+    vosk_model = Model(vosk_model_path)
+    _VOSK_BATCH = False
 
 # Function to transcribe using Whisper
-def transcribe_whisper(audio_path):
-    print(f"🎤 Whisper Processing: {audio_path}")
-    result = whisper_model.transcribe(audio_path)
-    return result["text"]
+def transcribe_whisper(audio, language=None):
+    # The batched pipeline computes log-mel features for all VAD segments of
+    # the file in one pass and feeds them to the encoder as a single batch,
+    # rather than filterbanking 30 s windows one at a time on the CPU
+    # Pure greedy decode: no beam, no best-of sampling, and no temperature
+    # fallback chain, which on clean 16 kHz converted audio only multiplies
+    # decoder passes without changing the text
+    segments, _ = whisper_batched.transcribe(
+        audio.numpy(),
+        batch_size=16,
+        beam_size=1,
+        best_of=1,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        without_timestamps=True,
+        language=language,
+    )
+    return " ".join(segment.text.strip() for segment in segments)
+
+def _pcm16_bytes(audio):
+    """Quantize a float32 waveform to the 16-bit PCM bytes Vosk expects."""
+    return (audio * 32767).to(torch.int16).numpy().tobytes()
+
+class WavDataset(Dataset):
+    """Dataset over wav paths so DataLoader workers decode in parallel."""
+
+    def __init__(self, paths):
+        self.paths = paths
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        path = self.paths[idx]
+        return path, load_audio(path)
+
+def _collate(batch):
+    """Keep variable-length audios as a list; the processor pads later."""
+    paths, audios = zip(*batch)
+    return list(paths), list(audios)
+
+def load_audio(audio_path):
+    """Decode a wav to a 16 kHz mono float32 tensor via torchaudio.
+
+    The converted_audio corpus is already 16 kHz, so the resample branch is
+    normally a no-op and this is just a straight C-level decode.
+    """
+    wav, sr = torchaudio.load(audio_path)
+    if sr != 16000:
+        wav = torchaudio.functional.resample(wav, sr, 16000)
+    return wav.mean(0)
 
 # Function to transcribe using Wav2Vec 2.0
-def transcribe_wav2vec(audio_path):
-    print(f"🎤 Wav2Vec 2.0 Processing: {audio_path}")
-    audio, rate = librosa.load(audio_path, sr=16000)
-    input_values = wav2vec_processor(audio, sampling_rate=16000, return_tensors="pt").input_values
-    with torch.no_grad():
-        logits = wav2vec_model(input_values).logits
-    predicted_ids = torch.argmax(logits, dim=-1)
-    return wav2vec_processor.batch_decode(predicted_ids)[0]
+def transcribe_wav2vec_batch(audio_arrays):
+    logger.info("🎤 Wav2Vec 2.0 Processing batch of %d files", len(audio_arrays))
+    inputs = wav2vec_processor(
+        audio_arrays, sampling_rate=16000, padding=True,
+        return_attention_mask=True, return_tensors="pt"
+    )
+    input_values = inputs.input_values
+    attention_mask = inputs.attention_mask
+    if wav2vec_session is not None:
+        logits = wav2vec_session.run(None, {
+            "input_values": input_values.numpy(),
+            "attention_mask": attention_mask.numpy(),
+        })[0]
+        return wav2vec_processor.batch_decode(logits.argmax(-1))
+    if _CUDA:
+        input_values = input_values.to(_W2V_DEVICE, non_blocking=True).half()
+        attention_mask = attention_mask.to(_W2V_DEVICE, non_blocking=True)
+        with torch.inference_mode(), torch.autocast("cuda", dtype=torch.float16):
+            logits = wav2vec_model(input_values, attention_mask=attention_mask).logits
+    else:
+        with torch.inference_mode():
+            logits = wav2vec_model(input_values, attention_mask=attention_mask).logits
+    # argmax stays on the device so only the token ids cross the PCIe bus
+    predicted_ids = logits.argmax(-1)
+    return wav2vec_processor.batch_decode(predicted_ids)
+
+def transcribe_vosk_batch(batch_audio):
+    """Decode several files concurrently through the Vosk batch model.
+
+    One BatchRecognizer per file; waveforms are fed round-robin so the
+    batch model fills its GPU lanes, and results are collected per stream.
+    """
+    logger.info("🎤 Vosk Processing batch of %d files", len(batch_audio))
+    recognizers = []
+    pcm_buffers = []
+    for audio in batch_audio:
+        recognizers.append(BatchRecognizer(vosk_model, 16000))
+        pcm_buffers.append(_pcm16_bytes(audio))
+
+    offsets = [0] * len(pcm_buffers)
+    pending = set(range(len(pcm_buffers)))
+    while pending:
+        for i in list(pending):
+            chunk = pcm_buffers[i][offsets[i]:offsets[i] + 32000]
+            if chunk:
+                recognizers[i].AcceptWaveform(chunk)
+                offsets[i] += 32000
+            else:
+                recognizers[i].FinishStream()
+                pending.discard(i)
+        vosk_model.Wait()
+
+    texts = []
+    for recognizer in recognizers:
+        parts = []
+        while True:
+            result = recognizer.Result()
+            if not result:
+                break
+            parts.append(json.loads(result).get("text", ""))
+        texts.append(" ".join(part for part in parts if part))
+    return texts
 
 # Function to transcribe using Vosk
-def transcribe_vosk(audio_path):
-    print(f"🎤 Vosk Processing: {audio_path}")
-    wf = wave.open(audio_path, "rb")
-    recognizer = KaldiRecognizer(vosk_model, wf.getframerate())
-    recognizer.SetWords(True)
-    transcription = []
-    while True:
-        data = wf.readframes(4000)
-        if len(data) == 0:
-            break
-        if recognizer.AcceptWaveform(data):
-            result = json.loads(recognizer.Result())
-            transcription.append(result.get("text", ""))
-    final_result = json.loads(recognizer.FinalResult())
-    transcription.append(final_result.get("text", ""))
-    return " ".join(transcription)
+def transcribe_vosk(audio):
+    recognizer = KaldiRecognizer(vosk_model, 16000)
+    # 32k-byte pushes over the shared decode: far fewer Python-binding
+    # crossings than the 4000-frame loop, and no intermediate Result()
+    # JSON parses — FinalResult carries the full utterance text
+    pcm = _pcm16_bytes(audio)
+    for i in range(0, len(pcm), 32000):
+        recognizer.AcceptWaveform(pcm[i:i + 32000])
+    return json.loads(recognizer.FinalResult()).get("text", "")
+
+# One padded Wav2Vec2 forward covers this many files; amortizes the
+# Python/CUDA launch overhead that dominates single-utterance calls
+WAV2VEC_BATCH = 8
+
+def _needs_transcription(audio_path):
+    """True unless a transcript newer than the audio already exists."""
+    file_name = os.path.splitext(os.path.basename(audio_path))[0]
+    output_path = os.path.join(TRANSCRIPT_DIR, f"{file_name}.json")
+    return not (
+        os.path.exists(output_path)
+        and os.path.getmtime(output_path) > os.path.getmtime(audio_path)
+    )
 
 # Process all .wav files in the directory
-def process_all_audio():
-    print(f"🔍 Scanning directory: {AUDIO_DIR}")
-    for root, _, files in os.walk(AUDIO_DIR):
-        for file in files:
-            if file.endswith(".wav"):
-                audio_path = os.path.join(root, file)
-                file_name = os.path.splitext(file)[0]  # Remove extension
-                
-                transcript_data = {
-                    "file_name": file,
-                    "whisper": transcribe_whisper(audio_path),
-                    "wav2vec": transcribe_wav2vec(audio_path),
-                    "vosk": transcribe_vosk(audio_path),
-                }
-
-                # Save transcript as JSON
-                output_path = os.path.join(TRANSCRIPT_DIR, f"{file_name}.json")
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(transcript_data, f, indent=4, ensure_ascii=False)
-
-                print(f"✅ Saved: {output_path}")
+def process_all_audio(force=False, language=None):
+    logger.info("🔍 Scanning directory: %s", AUDIO_DIR)
+    # Largest-first (LPT) ordering: long files start early, so no batch at
+    # the tail is left waiting on a single outsized decode
+    audio_paths = sorted(
+        glob.iglob(os.path.join(AUDIO_DIR, "**", "*.wav"), recursive=True),
+        key=os.path.getsize,
+        reverse=True,
+    )
+
+    # Reruns only pay for files whose transcript is missing or stale
+    if not force:
+        audio_paths = [path for path in audio_paths if _needs_transcription(path)]
+    if not audio_paths:
+        logger.info("✅ All transcripts up to date.")
+        return
+
+    # Worker processes decode the next batches while the GPU is busy with
+    # the current one; pinned memory keeps the H2D copies async-capable
+    loader = DataLoader(
+        WavDataset(audio_paths),
+        batch_size=WAV2VEC_BATCH,
+        num_workers=4,
+        pin_memory=_CUDA,
+        prefetch_factor=2,
+        collate_fn=_collate,
+    )
+
+    # The three backends are independent per batch: one thread per backend
+    # keeps both GPUs (and the Vosk decoder) busy at the same time
+    dispatch_pool = ThreadPoolExecutor(max_workers=3)
+
+    for batch_paths, batch_audio in loader:
+        # Each file is decoded from disk exactly once (in the DataLoader
+        # workers); all three backends share the same 16 kHz mono tensor
+        whisper_future = dispatch_pool.submit(
+            lambda audios: [transcribe_whisper(audio, language) for audio in audios],
+            batch_audio,
+        )
+        wav2vec_future = dispatch_pool.submit(transcribe_wav2vec_batch, batch_audio)
+        if _VOSK_BATCH:
+            vosk_future = dispatch_pool.submit(transcribe_vosk_batch, batch_audio)
+        else:
+            vosk_future = dispatch_pool.submit(
+                lambda audios: [transcribe_vosk(audio) for audio in audios],
+                batch_audio,
+            )
+
+        whisper_texts = whisper_future.result()
+        wav2vec_texts = wav2vec_future.result()
+        vosk_texts = vosk_future.result()
+
+        for audio_path, whisper_text, wav2vec_text, vosk_text in zip(
+            batch_paths, whisper_texts, wav2vec_texts, vosk_texts
+        ):
+            file = os.path.basename(audio_path)
+            file_name = os.path.splitext(file)[0]  # Remove extension
+
+            transcript_data = {
+                "file_name": file,
+                "whisper": whisper_text,
+                "wav2vec": wav2vec_text,
+                "vosk": vosk_text,
+            }
+
+            # Save transcript as JSON; orjson serializes straight to UTF-8
+            # bytes with no pure-Python encode pass
+            output_path = os.path.join(TRANSCRIPT_DIR, f"{file_name}.json")
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(transcript_data, option=orjson.OPT_INDENT_2))
+
+            logger.info("✅ Saved: %s", output_path)
+
+    dispatch_pool.shutdown()
 
 if __name__ == "__main__":
-    process_all_audio()
+    parser = argparse.ArgumentParser(description="Transcribe the converted audio corpus")
+    parser.add_argument("--force", action="store_true",
+                        help="re-transcribe files even if an up-to-date transcript exists")
+    parser.add_argument("--language", default=os.getenv("WHISPER_LANGUAGE"),
+                        help="Whisper language code (default: auto-detect)")
+    args = parser.parse_args()
+    process_all_audio(force=args.force, language=args.language)
@@ -0,0 +1,87 @@
+"""Create the project directory scaffold.
+
+Flat, idempotent scaffold step (the Python counterpart of the one in
+setup.ps1): directories are created with makedirs(exist_ok=True) and
+placeholder files with create-only opens, so re-running never truncates
+files that already have content.
+"""
+
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Leaf directories only — makedirs creates the intermediates
+DIRS = [
+    "data/raw",
+    "data/processed",
+    "data/annotations",
+    "data/splits",
+    "models/text_to_text",
+    "models/speech_to_text",
+    "models/text_to_speech",
+    "notebooks",
+    "backend/app",
+    "frontend/public",
+    "frontend/src/components",
+    "frontend/src/pages",
+    "mobile/lib/screens",
+    "mobile/lib/widgets",
+    "mobile/lib/services",
+    "mobile/assets",
+    "scripts",
+    "tests/backend_tests",
+    "tests/frontend_tests",
+    "tests/mobile_tests",
+    "config",
+    "docs",
+]
+
+FILES = [
+    "notebooks/data_exploration.ipynb",
+    "notebooks/model_training.ipynb",
+    "notebooks/preprocessing.ipynb",
+    "backend/app/__init__.py",
+    "backend/app/routes.py",
+    "backend/app/models.py",
+    "backend/app/utils.py",
+    "backend/requirements.txt",
+    "backend/Dockerfile",
+    "backend/run.py",
+    "frontend/src/App.js",
+    "frontend/src/index.js",
+    "frontend/src/styles.css",
+    "frontend/package.json",
+    "frontend/README.md",
+    "mobile/lib/main.dart",
+    "mobile/pubspec.yaml",
+    "mobile/package.json",
+    "mobile/README.md",
+    "scripts/preprocess_data.py",
+    "scripts/train_model.py",
+    "scripts/evaluate_model.py",
+    "config/config.yaml",
+    "config/model_config.yaml",
+    "config/deployment_config.yaml",
+    "docs/project_overview.md",
+    "docs/api_documentation.md",
+    "docs/user_manual.md",
+    ".gitignore",
+    "README.md",
+    "requirements.txt",
+]
+
+def create_structure():
+    """Create every scaffold directory and placeholder file in one flat pass."""
+    for rel_dir in DIRS:
+        os.makedirs(os.path.join(BASE_DIR, rel_dir), exist_ok=True)
+
+    for rel_file in FILES:
+        try:
+            # Create-only open: existing files are left untouched
+            open(os.path.join(BASE_DIR, rel_file), "x").close()
+        except FileExistsError:
+            pass
+
+if __name__ == "__main__":
+    create_structure()
+    print("Project structure created successfully!")
@@ -1,24 +1,40 @@
+import shutil
+import zipfile
+
+import gridfs
 from pymongo import MongoClient
 
 # Connect to MongoDB
 client = MongoClient("mongodb://localhost:27017/")
 db = client["transcription_db"]
 
-# Fetch all stored ZIP files
-zip_files = db.raw_audio.find()
+# Fetch all stored ZIP files — metadata only; excluding the binary payload
+# keeps the cursor from dragging every blob across the wire just to print keys
+zip_files = db.raw_audio.find({}, {"data": 0}).batch_size(100)
 
 print("\n📂 ZIP Files in MongoDB:")
 for file in zip_files:
-    print(f"📌 Full Document: {file}")  # Print entire document to see actual keys
+    print(f"📌 Full Document: {file}")
 
 
 # Find the zip file in MongoDB
-record = db.raw_text.find_one({"file_name": "bible_text_htm.zip"})
+record = db.raw_text.find_one({"file_name": "bible_text_htm.zip"}, {"data": 0})
 
 if record:
     zip_path = "retrieved_bible_text_htm.zip"
+    fs = gridfs.GridFS(db)
+    grid_file = fs.find_one({"filename": "bible_text_htm.zip"})
+
     with open(zip_path, "wb") as f:
-        f.write(record["data"])  # Save the binary data as a zip file
+        if grid_file is not None:
+            # Stream the blob in 1 MB chunks instead of materializing it
+            shutil.copyfileobj(grid_file, f, length=1024 * 1024)
+        else:
+            # Legacy inline payload: fetch just the binary field on demand
+            blob = db.raw_text.find_one(
+                {"file_name": "bible_text_htm.zip"}, {"data": 1}
+            )
+            f.write(blob["data"])
 
     print(f"✅ Retrieved and saved: {zip_path}")
 
@@ -26,4 +42,4 @@ if record:
     with zipfile.ZipFile(zip_path, "r") as zip_ref:
         extract_path = "extracted_htm_files"
         zip_ref.extractall(extract_path)
-        print(f"📂 Extracted to: {extract_path}")
\ No newline at end of file
+        print(f"📂 Extracted to: {extract_path}")